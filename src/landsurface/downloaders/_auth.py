@@ -0,0 +1,59 @@
+"""
+Process-wide NASA EARTHDATA authentication shared by all downloaders.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import earthaccess
+
+
+# Successful earthaccess logins keyed by username ('netrc' when no
+# username is given and earthaccess falls back to ~/.netrc)
+_AUTH_CACHE: Dict[str, Any] = {}
+# earthaccess keeps a single module-global login, so remember whose it is
+_ACTIVE_KEY: Optional[str] = None
+_AUTH_LOCK = threading.Lock()
+
+
+def ensure_login(
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    force: bool = False
+) -> Any:
+    """
+    Log in to NASA EARTHDATA once per process and user.
+    
+    earthaccess searches and downloads always use the most recent login.
+    Switching to a different account therefore logs in again, so that
+    the account passed here is the one earthaccess uses afterwards.
+    
+    Parameters
+    ----------
+    username : str, optional
+        NASA EARTHDATA username
+    password : str, optional
+        NASA EARTHDATA password
+    force : bool, optional
+        Log in again even if a cached login exists, e.g. after the server
+        rejected the current credentials. Default is False
+        
+    Returns
+    -------
+    earthaccess.Auth
+        earthaccess authentication object
+    """
+    global _ACTIVE_KEY
+    key = username or 'netrc'
+    with _AUTH_LOCK:
+        if not force and key == _ACTIVE_KEY and key in _AUTH_CACHE:
+            return _AUTH_CACHE[key]
+        
+        auth = earthaccess.login(username=username, password=password)
+        # Only remember logins that worked so a failed one can be retried
+        if getattr(auth, 'authenticated', True):
+            _AUTH_CACHE[key] = auth
+            _ACTIVE_KEY = key
+        else:
+            _ACTIVE_KEY = None
+        return auth
@@ -0,0 +1,414 @@
+"""
+Shared download workflow for NASA EARTHDATA products.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+import earthaccess
+import requests
+
+from landsurface.downloaders._auth import ensure_login
+from landsurface.downloaders.base import (
+    BaseDownloader,
+    _in_download_executor,
+    get_download_executor,
+)
+
+
+class EarthdataDownloaderMixin(BaseDownloader):
+    """
+    Common behaviour for downloaders backed by NASA EARTHDATA.
+    
+    Handles authentication, granule search and concurrent granule download
+    through ``earthaccess``. Subclasses only define ``SUPPORTED_PRODUCTS``,
+    mapping product short names to objects with a ``description``
+    attribute, and a default ``output_dir``.
+    
+    Parameters
+    ----------
+    username : str, optional
+        NASA EARTHDATA username
+    password : str, optional
+        NASA EARTHDATA password
+    output_dir : str, optional
+        Directory to save downloaded files. Default is './data'
+    verbose : bool, optional
+        Enable verbose logging. Default is True
+    """
+    
+    SUPPORTED_PRODUCTS: ClassVar[Dict[str, Any]] = {}
+    _SUPPORTED_KEYS: ClassVar[FrozenSet[str]] = frozenset()
+    _SUPPORTED_KEYS_TUPLE: ClassVar[Tuple[str, ...]] = ()
+    _SUPPORTED_VIEW: ClassVar[Mapping[str, str]] = MappingProxyType({})
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Built once per class so product validation and listing do not
+        # allocate
+        cls._SUPPORTED_KEYS = frozenset(cls.SUPPORTED_PRODUCTS)
+        cls._SUPPORTED_KEYS_TUPLE = tuple(sorted(cls.SUPPORTED_PRODUCTS))
+        cls._SUPPORTED_VIEW = MappingProxyType({
+            code: spec.description
+            for code, spec in cls.SUPPORTED_PRODUCTS.items()
+        })
+    
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        output_dir: str = './data',
+        verbose: bool = True
+    ):
+        super().__init__(username, password, output_dir, verbose)
+        
+        # Authenticate with NASA EARTHDATA
+        if username and password:
+            self._authenticate()
+    
+    def _authenticate(self) -> None:
+        """Authenticate with NASA EARTHDATA system."""
+        try:
+            self._auth = ensure_login(self.username, self.password)
+            self.logger.info("Successfully authenticated with NASA EARTHDATA")
+        except Exception as e:
+            self.logger.error("Authentication failed: %s", e)
+            raise
+    
+    def list_products(self) -> Mapping[str, str]:
+        """
+        List all supported products.
+        
+        Returns
+        -------
+        mapping
+            Read-only mapping of product codes to descriptions. Copy it with
+            ``dict()`` if it needs to be modified
+        """
+        return self._SUPPORTED_VIEW
+    
+    def download_product(
+        self,
+        product: str,
+        bbox: Tuple[float, float, float, float],
+        start_date: str,
+        end_date: str,
+        output_dir: Optional[str] = None,
+        skip_existing: bool = True,
+        max_files: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        cache: bool = True,
+        preload_mmap: bool = False
+    ) -> Union[List[Path], List[Tuple[Path, Optional[mmap.mmap]]]]:
+        """
+        Download a product for specified area and time period.
+        
+        Parameters
+        ----------
+        product : str
+            Product short name, one of ``SUPPORTED_PRODUCTS``
+        bbox : tuple
+            Bounding box as (west, south, east, north) in decimal degrees
+        start_date : str
+            Start date in format 'YYYY-MM-DD'
+        end_date : str
+            End date in format 'YYYY-MM-DD'
+        output_dir : str, optional
+            Override default output directory
+        skip_existing : bool, optional
+            Skip downloading if file already exists. Default is True
+        max_files : int, optional
+            Maximum number of files to download. Useful for testing
+        max_workers : int, optional
+            Number of granules to download concurrently in a pool private to
+            this call. By default the thread pool shared by all downloaders
+            is used (see ``get_download_executor``). It has four workers per
+            CPU, at most 32, or ``LANDSURFACE_MAX_WORKERS`` if that is set.
+            Required when called from a task running on that shared pool
+        cache : bool, optional
+            Reuse granule search results from a previous identical query made
+            within the last 24 hours. Default is True
+        preload_mmap : bool, optional
+            Also return a read-only memory map of each file, with its pages
+            already being read into memory. Useful when the files are opened
+            by the same process right away. Default is False
+            
+        Returns
+        -------
+        list
+            List of Path objects for downloaded files in search order, or of
+            (Path, mmap.mmap) tuples if ``preload_mmap`` is True. The map is
+            None for empty files, which cannot be memory-mapped
+            
+        Raises
+        ------
+        ValueError
+            If product is not supported or parameters are invalid
+        RuntimeError
+            If download fails, or if called from the shared download pool
+            without ``max_workers``
+            
+        Examples
+        --------
+        >>> downloader = MODISDownloader(username='user', password='pass')
+        >>> files = downloader.download_product(
+        ...     product='MOD13A2',
+        ...     bbox=(-120, 35, -115, 40),
+        ...     start_date='2024-01-01',
+        ...     end_date='2024-03-31'
+        ... )
+        >>> print(f"Downloaded {len(files)} files")
+        """
+        # Validate inputs
+        if product not in self._SUPPORTED_KEYS:
+            raise ValueError(
+                f"Product '{product}' not supported. "
+                f"Supported products: {self._SUPPORTED_KEYS_TUPLE}"
+            )
+        
+        self._validate_bbox(bbox)
+        start_dt, end_dt = self._validate_dates(start_date, end_date)
+        
+        if max_workers is None and _in_download_executor():
+            raise RuntimeError(
+                "download_product cannot use the shared download pool from "
+                "one of its own workers; pass max_workers"
+            )
+        
+        # Set output directory
+        if output_dir:
+            save_dir = Path(output_dir)
+        else:
+            save_dir = self.output_dir / product.lower()
+        save_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.logger.info("Searching for %s data", product)
+        self.logger.info("Area: %s", bbox)
+        self.logger.info("Period: %s to %s", start_date, end_date)
+        
+        try:
+            # Search for granules
+            search_kwargs = dict(
+                short_name=product,
+                temporal=(start_date, end_date),
+                bounding_box=bbox
+            )
+            if cache:
+                results = self._search_cached(**search_kwargs)
+            else:
+                results = earthaccess.search_data(**search_kwargs)
+            
+            if not results:
+                self.logger.warning("No granules found for the specified parameters")
+                return []
+            
+            self.logger.info("Found %s granules", len(results))
+            
+            # Limit number of files if specified
+            if max_files and len(results) > max_files:
+                self.logger.info("Limiting download to %s files", max_files)
+                results = results[:max_files]
+            
+            # Files of each granule, in search order
+            granule_files: List[List[Path]] = [[] for _ in results]
+            pending = []
+            if max_workers is None:
+                pool = nullcontext(get_download_executor())
+            else:
+                pool = ThreadPoolExecutor(max_workers=max_workers)
+            
+            with pool as executor:
+                # Drop granules whose files are already on disk and match the
+                # server's copy before starting any download for them
+                on_disk = executor.map(
+                    lambda granule: self._granule_on_disk(
+                        granule, save_dir, skip_existing
+                    ),
+                    results
+                )
+                for i, (granule, (local_paths, stale)) in enumerate(zip(results, on_disk)):
+                    if local_paths:
+                        granule_files[i] = local_paths
+                    else:
+                        pending.append((i, granule, stale))
+                
+                if len(pending) < len(results):
+                    self.logger.info(
+                        "Skipping %s granules already downloaded",
+                        len(results) - len(pending)
+                    )
+                
+                # Download granules concurrently; each one is an independent
+                # HTTPS transfer, so overlapping them hides per-request latency
+                futures = {
+                    executor.submit(self._download_one, granule, save_dir, stale): i
+                    for i, granule, stale in pending
+                }
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        granule_files[futures[future]] = future.result()
+                        self.logger.info("Downloaded file %s/%s", done, len(pending))
+                except BaseException:
+                    # Don't start the remaining granules once one has failed;
+                    # downloads already running cannot be interrupted
+                    for future in futures:
+                        future.cancel()
+                    raise
+            
+            downloaded_files = [path for paths in granule_files for path in paths]
+            self.logger.info("Successfully downloaded %s files", len(downloaded_files))
+            
+            if preload_mmap:
+                return [(path, self._mmap_file(path)) for path in downloaded_files]
+            return downloaded_files
+            
+        except Exception as e:
+            self.logger.error("Download failed: %s", e)
+            raise RuntimeError(f"Failed to download {product} data: {e}")
+    
+    def _search_cached(self, ttl: float = 86400, **kwargs) -> list:
+        """
+        Search for granules, reusing results cached on disk.
+        
+        Results are stored under ``<output_dir>/.search_cache`` keyed by a
+        hash of the search parameters.
+        
+        Parameters
+        ----------
+        ttl : float, optional
+            Maximum age of a cached result in seconds. Default is 86400
+        **kwargs
+            Search parameters passed to ``earthaccess.search_data``
+            
+        Returns
+        -------
+        list
+            Granules matching the search parameters
+        """
+        key = hashlib.blake2b(
+            repr(sorted(kwargs.items())).encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+        cache_dir = self.output_dir / '.search_cache'
+        cache_path = cache_dir / f'{key}.pkl'
+        
+        if cache_path.exists() and time.time() - cache_path.stat().st_mtime < ttl:
+            # Any failure to load (truncated file, pickle from an older
+            # earthaccess, ...) is treated as a cache miss
+            try:
+                with open(cache_path, 'rb') as f:
+                    results = pickle.load(f)
+                self.logger.info("Using cached search results")
+                return results
+            except Exception as e:
+                self.logger.warning("Ignoring unreadable search cache: %s", e)
+        
+        results = earthaccess.search_data(**kwargs)
+        
+        # The search already succeeded, so failing to cache it must not
+        # fail the download
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(results, f)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            self.logger.warning("Could not cache search results: %s", e)
+            tmp_path.unlink(missing_ok=True)
+        
+        return results
+    
+    def _remote_session(self) -> Optional[requests.Session]:
+        """
+        Get the session earthaccess authenticated at login.
+        
+        Granule links redirect through Earthdata Login, which only this
+        session can follow.
+        
+        Returns
+        -------
+        requests.Session or None
+            Authenticated session, or None before any login
+        """
+        try:
+            return earthaccess.get_requests_https_session()
+        except AttributeError:
+            # earthaccess has not logged in yet
+            return None
+    
+    def _granule_on_disk(
+        self,
+        granule,
+        save_dir: Path,
+        skip_existing: bool
+    ) -> Tuple[Optional[List[Path]], List[Path]]:
+        """
+        Check whether all data files of a granule are already downloaded.
+        
+        Nothing is removed here, so that existing files are kept if the
+        download fails before reaching this granule.
+        
+        Parameters
+        ----------
+        granule : earthaccess.DataGranule
+            Granule returned by ``earthaccess.search_data``
+        save_dir : Path
+            Directory the granule files are saved to
+        skip_existing : bool
+            If False, existing files are downloaded again
+            
+        Returns
+        -------
+        tuple
+            Local paths of the granule's files if they can be skipped, or
+            None if the granule has to be downloaded, and the existing files
+            that have to be replaced when it is
+        """
+        links = granule.data_links()
+        paths = [save_dir / link.rsplit('/', 1)[-1] for link in links]
+        stale = []
+        complete = bool(paths)
+        for path, url in zip(paths, links):
+            if self._check_file_exists(path, skip_existing, url):
+                continue
+            complete = False
+            if path.exists():
+                stale.append(path)
+        return (paths if complete else None), stale
+    
+    def _download_one(
+        self,
+        granule,
+        save_dir: Path,
+        stale: List[Path]
+    ) -> List[Path]:
+        """
+        Download a single granule.
+        
+        Parameters
+        ----------
+        granule : earthaccess.DataGranule
+            Granule returned by ``earthaccess.search_data``
+        save_dir : Path
+            Directory to save the granule files
+        stale : list
+            Existing files of the granule to replace
+            
+        Returns
+        -------
+        list
+            List of Path objects for the downloaded files
+        """
+        # earthaccess does not overwrite existing files
+        for path in stale:
+            path.unlink(missing_ok=True)
+        local_files = earthaccess.download(granule, str(save_dir))
+        return [Path(f) for f in local_files or []]
@@ -3,14 +3,185 @@ Base downloader class providing common functionality for all data downloaders.
 """
 
 import os
+import re
+import hashlib
+import mmap
 import logging
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
 from datetime import datetime
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tqdm import tqdm
 
 
+# Sessions shared by every downloader using the same credentials, so that
+# pooled keep-alive connections (and their TLS state) are reused across
+# instances instead of being re-established for each downloader. Keyed by
+# a digest of the credentials; only the most recently used are kept.
+_SESSION_CACHE: 'OrderedDict[str, requests.Session]' = OrderedDict()
+_SESSION_CACHE_SIZE = 4
+_SESSION_LOCK = threading.Lock()
+
+# Thread pool shared by all downloaders in the process, so that running
+# several downloaders at once does not multiply threads and connections
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+_EXECUTOR_THREAD_PREFIX = 'landsurface-download'
+_MAX_DEFAULT_WORKERS = 32
+
+_ISO_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+# ETag of an object uploaded to S3 in one part without SSE-KMS or SSE-C
+# encryption, which is its MD5 digest
+_MD5_ETAG = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _md5sum(path: Path) -> str:
+    """Compute the hex MD5 digest of a file."""
+    digest = hashlib.md5()
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_date(date_string: str, date_format: str) -> datetime:
+    """
+    Parse a date string, with a fast path for ISO 'YYYY-MM-DD' dates.
+    
+    Parameters
+    ----------
+    date_string : str
+        Date string to parse
+    date_format : str
+        ``strptime`` format of the date string
+        
+    Returns
+    -------
+    datetime
+        Parsed date
+        
+    Raises
+    ------
+    ValueError
+        If the date string does not match the format
+    """
+    if date_format == '%Y-%m-%d':
+        match = _ISO_DATE.fullmatch(date_string)
+        if match:
+            return datetime(int(match[1]), int(match[2]), int(match[3]))
+    return datetime.strptime(date_string, date_format)
+
+
+def get_download_executor() -> ThreadPoolExecutor:
+    """
+    Get the download thread pool shared by all downloaders.
+    
+    The pool has four workers per CPU, at most 32 (the number of pooled
+    connections per host of the shared sessions), unless the
+    ``LANDSURFACE_MAX_WORKERS`` environment variable is set when it is
+    first created.
+    
+    Tasks submitted to this pool must not themselves call
+    ``download_product`` with the shared pool: they would wait on work
+    queued behind them and can deadlock. Such calls are rejected; pass
+    ``max_workers`` to give them a private pool instead.
+    
+    Returns
+    -------
+    ThreadPoolExecutor
+        The shared executor
+        
+    Raises
+    ------
+    ValueError
+        If ``LANDSURFACE_MAX_WORKERS`` is not a positive integer
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            setting = os.environ.get('LANDSURFACE_MAX_WORKERS', '').strip()
+            if setting:
+                try:
+                    max_workers = int(setting)
+                except ValueError:
+                    max_workers = 0
+                if max_workers < 1:
+                    raise ValueError(
+                        "LANDSURFACE_MAX_WORKERS must be a positive integer, "
+                        f"got {setting!r}"
+                    )
+            else:
+                max_workers = min((os.cpu_count() or 1) * 4, _MAX_DEFAULT_WORKERS)
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=_EXECUTOR_THREAD_PREFIX
+            )
+        return _EXECUTOR
+
+
+def _in_download_executor() -> bool:
+    """Check whether the current thread is a shared download pool worker."""
+    return threading.current_thread().name.startswith(_EXECUTOR_THREAD_PREFIX)
+
+
+def _get_shared_session(
+    auth: Tuple[Optional[str], Optional[str]]
+) -> requests.Session:
+    """
+    Get the process-wide HTTP session for a set of credentials.
+    
+    Sessions of the least recently used credentials are dropped from the
+    cache once it is full. They are not closed, since downloaders may
+    still hold them, and release their connections when garbage collected.
+    
+    Parameters
+    ----------
+    auth : tuple
+        Username and password. Use ``(None, None)`` for anonymous access
+        
+    Returns
+    -------
+    requests.Session
+        Session with a pooled, retrying adapter mounted for HTTP and HTTPS
+    """
+    key = hashlib.blake2b(repr(auth).encode('utf-8'), digest_size=16).hexdigest()
+    with _SESSION_LOCK:
+        session = _SESSION_CACHE.get(key)
+        if session is not None:
+            _SESSION_CACHE.move_to_end(key)
+        else:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[502, 503, 504]
+                )
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if auth[0] and auth[1]:
+                session.auth = auth
+            _SESSION_CACHE[key] = session
+            if len(_SESSION_CACHE) > _SESSION_CACHE_SIZE:
+                _SESSION_CACHE.popitem(last=False)
+        return session
+
+
 class BaseDownloader:
     """
     Base class for data downloaders.
@@ -48,10 +219,9 @@ class BaseDownloader:
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Session for HTTP requests
-        self.session = requests.Session()
-        if username and password:
-            self.session.auth = (username, password)
+        # Session for HTTP requests, shared with other downloaders using
+        # the same credentials
+        self.session = _get_shared_session((username, password))
     
     def _setup_logger(self) -> logging.Logger:
         """Configure logging for the downloader."""
@@ -102,6 +272,41 @@ class BaseDownloader:
         if south >= north:
             raise ValueError("Southern latitude must be less than northern latitude")
     
+    def _validate_bboxes(self, bboxes: np.ndarray) -> None:
+        """
+        Validate many bounding boxes at once.
+        
+        Parameters
+        ----------
+        bboxes : array_like
+            Array of shape (N, 4) with rows of (west, south, east, north)
+            in decimal degrees
+            
+        Raises
+        ------
+        ValueError
+            If the array has the wrong shape or any bounding box is invalid
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float64)
+        if bboxes.ndim != 2 or bboxes.shape[1] != 4:
+            raise ValueError(
+                f"Bounding boxes must have shape (N, 4), got {bboxes.shape}"
+            )
+        
+        west, south, east, north = bboxes.T
+        # Expressed as validity checks so that NaN coordinates fail them
+        valid = (
+            (-180 <= west) & (west <= 180)
+            & (-180 <= east) & (east <= 180)
+            & (-90 <= south) & (south <= 90)
+            & (-90 <= north) & (north <= 90)
+            & (west < east)
+            & (south < north)
+        )
+        if not valid.all():
+            bad = np.flatnonzero(~valid).tolist()
+            raise ValueError(f"Invalid bounding boxes at indices {bad}")
+    
     def _validate_dates(
         self,
         start_date: str,
@@ -131,8 +336,8 @@ class BaseDownloader:
             If dates are invalid or in wrong order
         """
         try:
-            start_dt = datetime.strptime(start_date, date_format)
-            end_dt = datetime.strptime(end_date, date_format)
+            start_dt = _parse_date(start_date, date_format)
+            end_dt = _parse_date(end_date, date_format)
         except ValueError as e:
             raise ValueError(f"Invalid date format. Expected {date_format}: {e}")
         
@@ -146,11 +351,16 @@ class BaseDownloader:
         url: str,
         output_path: Path,
         show_progress: bool = True,
-        chunk_size: int = 8192
+        chunk_size: int = 1 << 20
     ) -> Path:
         """
         Download a file from a URL with progress tracking.
         
+        If a partial file already exists at ``output_path``, the download is
+        resumed with an HTTP Range request. The file is downloaded from the
+        start if the server ignores the range, or if it rejects the range
+        and reports a smaller size than the local file.
+        
         Parameters
         ----------
         url : str
@@ -160,7 +370,7 @@ class BaseDownloader:
         show_progress : bool, optional
             Show download progress bar. Default is True
         chunk_size : int, optional
-            Download chunk size in bytes. Default is 8192
+            Download chunk size in bytes. Default is 1 MiB
             
         Returns
         -------
@@ -172,31 +382,103 @@ class BaseDownloader:
         requests.exceptions.RequestException
             If download fails
         """
-        self.logger.info(f"Downloading from {url}")
+        self.logger.info("Downloading from %s", url)
         
-        response = self.session.get(url, stream=True)
-        response.raise_for_status()
+        resume_from = output_path.stat().st_size if output_path.exists() else 0
+        headers = {}
+        if resume_from > 0:
+            headers['Range'] = f'bytes={resume_from}-'
         
-        total_size = int(response.headers.get('content-length', 0))
+        # The ranged GET is sent directly rather than after a HEAD, which
+        # some servers (such as pre-signed S3 URLs) reject
+        response = self.session.get(url, stream=True, headers=headers)
+        if response.status_code == 416:
+            # The range starts at or past the end of the server's copy
+            remote_size = response.headers.get('content-range', '').rpartition('/')[2]
+            response.close()
+            if remote_size == str(resume_from):
+                self.logger.info("File already complete: %s", output_path)
+                return output_path
+            resume_from = 0
+            response = self.session.get(url, stream=True)
         
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_path, 'wb') as f:
-            if show_progress and total_size > 0:
-                with tqdm(total=total_size, unit='B', unit_scale=True, desc=output_path.name) as pbar:
+        with response:
+            response.raise_for_status()
+            
+            # Servers that ignore the Range header answer 200 with the full body
+            if response.status_code != 206:
+                resume_from = 0
+            elif resume_from > 0:
+                self.logger.info("Resuming from byte %s", resume_from)
+            
+            total_size = int(response.headers.get('content-length', 0))
+            
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            mode = 'ab' if resume_from > 0 else 'wb'
+            with open(output_path, mode) as f:
+                if show_progress and total_size > 0:
+                    with tqdm(
+                        total=resume_from + total_size,
+                        initial=resume_from,
+                        unit='B',
+                        unit_scale=True,
+                        desc=output_path.name,
+                        mininterval=0.5
+                    ) as pbar:
+                        # Update the bar at most once per MiB; each update takes
+                        # tqdm's lock, which adds up with small chunks
+                        pending = 0
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if chunk:
+                                f.write(chunk)
+                                pending += len(chunk)
+                                if pending >= 1 << 20:
+                                    pbar.update(pending)
+                                    pending = 0
+                        pbar.update(pending)
+                else:
                     for chunk in response.iter_content(chunk_size=chunk_size):
                         if chunk:
                             f.write(chunk)
-                            pbar.update(len(chunk))
-            else:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
         
-        self.logger.info(f"Downloaded to {output_path}")
+        self.logger.info("Downloaded to %s", output_path)
         return output_path
     
-    def _check_file_exists(self, filepath: Path, skip_existing: bool = True) -> bool:
+    def _mmap_file(self, path: Path) -> Optional[mmap.mmap]:
+        """
+        Memory-map a downloaded file read-only.
+        
+        The kernel is asked to start reading the file into the page cache so
+        that later access does not wait on disk.
+        
+        Parameters
+        ----------
+        path : Path
+            File to map
+            
+        Returns
+        -------
+        mmap.mmap or None
+            Read-only memory map of the whole file, or None if the file is
+            empty (empty files cannot be mapped)
+        """
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if os.fstat(fd).st_size == 0:
+                return None
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+    
+    def _check_file_exists(
+        self,
+        filepath: Path,
+        skip_existing: bool = True,
+        url: Optional[str] = None
+    ) -> bool:
         """
         Check if a file already exists.
         
@@ -206,6 +488,10 @@ class BaseDownloader:
             Path to check
         skip_existing : bool, optional
             If True, skip download if file exists. Default is True
+        url : str, optional
+            URL the file is downloaded from. If given, an existing file is
+            only skipped if it matches the size and checksum reported by
+            the server
             
         Returns
         -------
@@ -213,10 +499,93 @@ class BaseDownloader:
             True if file exists and should be skipped, False otherwise
         """
         if filepath.exists() and skip_existing:
-            self.logger.info(f"File already exists, skipping: {filepath}")
+            if url is not None and not self._matches_remote(filepath, url):
+                self.logger.info("File differs from server copy, downloading again: %s", filepath)
+                return False
+            self.logger.info("File already exists, skipping: %s", filepath)
             return True
         return False
     
+    def _remote_session(self) -> Optional[requests.Session]:
+        """
+        Get the session used to query servers about files already on disk.
+        
+        Returns
+        -------
+        requests.Session or None
+            Session to use, or None if no suitable session is available
+        """
+        return self.session
+    
+    def _matches_remote(self, path: Path, url: str) -> bool:
+        """
+        Compare a local file with the server's copy.
+        
+        Only the first byte is requested, so the server reports the full
+        size (in Content-Range) and ETag without sending the file. A ranged
+        GET is used rather than HEAD because pre-signed S3 redirects only
+        accept the method they were signed for. The MD5 of the local file is
+        only compared with the ETag when S3 reports SSE-S3 encryption. Other
+        servers, and S3 objects encrypted with SSE-KMS or SSE-C, may send
+        ETags that look like an MD5 digest but are not one.
+        
+        Parameters
+        ----------
+        path : Path
+            Local file
+        url : str
+            URL of the server's copy
+            
+        Returns
+        -------
+        bool
+            False if the server reports a different size or checksum. True
+            otherwise, including when the file cannot be checked, which is
+            logged as a warning
+        """
+        session = self._remote_session()
+        if session is None:
+            self.logger.warning("Cannot verify %s, no authenticated session", path)
+            return True
+        
+        try:
+            with session.get(
+                url,
+                headers={'Range': 'bytes=0-0'},
+                stream=True,
+                allow_redirects=True
+            ) as response:
+                status = response.status_code
+                headers = response.headers
+        except requests.RequestException as e:
+            self.logger.warning("Cannot verify %s against %s: %s", path, url, e)
+            return True
+        
+        # Anything other than the file itself (errors, login pages) says
+        # nothing about whether the local copy is complete
+        content_type = headers.get('content-type', '')
+        if status not in (200, 206) or content_type.startswith('text/html'):
+            self.logger.warning(
+                "Cannot verify %s against %s: server answered %s %s",
+                path, url, status, content_type
+            )
+            return True
+        
+        if status == 206:
+            remote_size = headers.get('content-range', '').rpartition('/')[2]
+        else:
+            remote_size = headers.get('content-length', '')
+        if remote_size.isdigit() and int(remote_size) != path.stat().st_size:
+            return False
+        
+        if headers.get('x-amz-server-side-encryption') != 'AES256':
+            return True
+        etag = headers.get('etag', '').lower()
+        etag = etag.removeprefix('w/').strip('"')
+        if _MD5_ETAG.match(etag):
+            return _md5sum(path) == etag
+        return True
+    
     def get_credentials(self) -> Tuple[Optional[str], Optional[str]]:
         """
         Get stored credentials.
@@ -241,5 +610,5 @@ class BaseDownloader:
         """
         self.username = username
         self.password = password
-        self.session.auth = (username, password)
+        self.session = _get_shared_session((username, password))
         self.logger.info("Credentials updated")
@@ -0,0 +1,133 @@
+"""
+Tests for resuming partial downloads and the shared sessions and pool.
+"""
+
+from unittest import mock
+
+import pytest
+
+from landsurface.downloaders import base
+from landsurface.downloaders.base import BaseDownloader, get_download_executor
+
+
+URL = 'https://example.com/granule.hdf'
+CONTENT = b'granule data'
+
+
+def make_response(status, body=b'', headers=None):
+    response = mock.MagicMock()
+    response.status_code = status
+    response.headers = dict(headers or {})
+    response.headers.setdefault('content-length', str(len(body)))
+    response.iter_content.return_value = [body]
+    response.__enter__.return_value = response
+    return response
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    downloader = BaseDownloader(output_dir=str(tmp_path), verbose=False)
+    downloader.session = mock.Mock()
+    return downloader
+
+
+@pytest.fixture
+def output_path(tmp_path):
+    return tmp_path / 'granule.hdf'
+
+
+def test_partial_file_is_resumed(downloader, output_path):
+    output_path.write_bytes(CONTENT[:5])
+    downloader.session.get.return_value = make_response(206, CONTENT[5:])
+    
+    downloader._download_file(URL, output_path, show_progress=False)
+    
+    assert output_path.read_bytes() == CONTENT
+    downloader.session.head.assert_not_called()
+    request = downloader.session.get.call_args
+    assert request.kwargs['headers'] == {'Range': 'bytes=5-'}
+
+
+def test_ignored_range_restarts_download(downloader, output_path):
+    output_path.write_bytes(CONTENT[:5])
+    downloader.session.get.return_value = make_response(200, CONTENT)
+    
+    downloader._download_file(URL, output_path, show_progress=False)
+    
+    assert output_path.read_bytes() == CONTENT
+
+
+def test_oversized_file_is_downloaded_again(downloader, output_path):
+    output_path.write_bytes(CONTENT + b'garbage')
+    downloader.session.get.side_effect = [
+        make_response(416, headers={'content-range': f'bytes */{len(CONTENT)}'}),
+        make_response(200, CONTENT),
+    ]
+    
+    downloader._download_file(URL, output_path, show_progress=False)
+    
+    assert output_path.read_bytes() == CONTENT
+    retry = downloader.session.get.call_args
+    assert 'headers' not in retry.kwargs
+
+
+def test_complete_file_is_kept(downloader, output_path):
+    output_path.write_bytes(CONTENT)
+    downloader.session.get.return_value = make_response(
+        416, headers={'content-range': f'bytes */{len(CONTENT)}'}
+    )
+    
+    downloader._download_file(URL, output_path, show_progress=False)
+    
+    assert output_path.read_bytes() == CONTENT
+    assert downloader.session.get.call_count == 1
+
+
+@pytest.fixture
+def fresh_executor(monkeypatch):
+    monkeypatch.setattr(base, '_EXECUTOR', None)
+    yield
+    if base._EXECUTOR is not None:
+        base._EXECUTOR.shutdown()
+
+
+@pytest.mark.parametrize('setting', ['abc', '0', '-2', '1.5'])
+def test_invalid_max_workers_setting_is_rejected(monkeypatch, fresh_executor, setting):
+    monkeypatch.setenv('LANDSURFACE_MAX_WORKERS', setting)
+    
+    with pytest.raises(ValueError, match='LANDSURFACE_MAX_WORKERS'):
+        get_download_executor()
+
+
+def test_max_workers_setting_is_used(monkeypatch, fresh_executor):
+    monkeypatch.setenv('LANDSURFACE_MAX_WORKERS', '3')
+    
+    assert get_download_executor()._max_workers == 3
+
+
+def test_default_max_workers_is_capped(monkeypatch, fresh_executor):
+    monkeypatch.setenv('LANDSURFACE_MAX_WORKERS', '')
+    monkeypatch.setattr(base.os, 'cpu_count', lambda: 64)
+    
+    assert get_download_executor()._max_workers == 32
+
+
+def test_session_is_shared_per_credentials(monkeypatch):
+    monkeypatch.setattr(base, '_SESSION_CACHE', base.OrderedDict())
+    
+    first = base._get_shared_session(('user', 'secret'))
+    
+    assert base._get_shared_session(('user', 'secret')) is first
+    assert base._get_shared_session(('other', 'secret')) is not first
+    assert not any('secret' in key for key in base._SESSION_CACHE)
+
+
+def test_session_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(base, '_SESSION_CACHE', base.OrderedDict())
+    
+    first = base._get_shared_session(('user0', 'secret'))
+    for i in range(1, base._SESSION_CACHE_SIZE + 1):
+        base._get_shared_session((f'user{i}', 'secret'))
+    
+    assert len(base._SESSION_CACHE) == base._SESSION_CACHE_SIZE
+    assert base._get_shared_session(('user0', 'secret')) is not first
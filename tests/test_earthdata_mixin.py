@@ -0,0 +1,252 @@
+"""
+Tests for skipping granules that are already downloaded.
+"""
+
+import hashlib
+import threading
+from unittest import mock
+
+import pytest
+
+from landsurface.downloaders.base import get_download_executor
+from landsurface.downloaders.modis import MODISDownloader
+
+
+URL = 'https://data.example.nasa.gov/MOD13A2/granule.hdf'
+CONTENT = b'granule data' * 100
+
+
+def make_response(status=206, size=len(CONTENT), etag=None,
+                  content_type='application/x-hdf', encryption=None):
+    response = mock.MagicMock()
+    response.status_code = status
+    response.headers = {
+        'content-type': content_type,
+        'content-range': f'bytes 0-0/{size}',
+    }
+    if etag is not None:
+        response.headers['etag'] = etag
+    if encryption is not None:
+        response.headers['x-amz-server-side-encryption'] = encryption
+    response.__enter__.return_value = response
+    return response
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    return MODISDownloader(output_dir=str(tmp_path), verbose=False)
+
+
+@pytest.fixture
+def granule():
+    granule = mock.Mock()
+    granule.data_links.return_value = [URL]
+    return granule
+
+
+@pytest.fixture
+def local_file(tmp_path):
+    path = tmp_path / 'granule.hdf'
+    path.write_bytes(CONTENT)
+    return path
+
+
+def patch_session(response):
+    session = mock.Mock()
+    session.get.return_value = response
+    return mock.patch(
+        'earthaccess.get_requests_https_session', return_value=session
+    )
+
+
+def test_matching_size_and_md5_etag_is_skipped(downloader, granule, local_file):
+    etag = '"%s"' % hashlib.md5(CONTENT).hexdigest()
+    response = make_response(etag=etag, encryption='AES256')
+    with patch_session(response) as get_session:
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, True)
+    
+    assert paths == [local_file]
+    assert stale == []
+    assert local_file.exists()
+    request = get_session.return_value.get.call_args
+    assert request.args == (URL,)
+    assert request.kwargs['headers'] == {'Range': 'bytes=0-0'}
+
+
+def test_size_mismatch_marks_file_stale(downloader, granule, local_file):
+    with patch_session(make_response(size=len(CONTENT) + 1)):
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, True)
+    
+    assert paths is None
+    assert stale == [local_file]
+    assert local_file.exists()
+
+
+def test_md5_etag_mismatch_marks_file_stale(downloader, granule, local_file):
+    etag = '"%s"' % hashlib.md5(b'other data').hexdigest()
+    with patch_session(make_response(etag=etag, encryption='AES256')):
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, True)
+    
+    assert paths is None
+    assert stale == [local_file]
+
+
+def test_kms_etag_only_checks_size(downloader, granule, local_file):
+    # SSE-KMS ETags are 32 hex digits but not the MD5 of the object
+    etag = '"%s"' % hashlib.md5(b'other data').hexdigest()
+    with patch_session(make_response(etag=etag, encryption='aws:kms')):
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, True)
+    
+    assert paths == [local_file]
+
+
+def test_non_md5_etag_only_checks_size(downloader, granule, local_file):
+    with patch_session(make_response(etag='"abc123-4"', encryption='AES256')):
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, True)
+    
+    assert paths == [local_file]
+
+
+def test_login_page_keeps_file_and_warns(downloader, granule, local_file, caplog):
+    response = make_response(status=200, content_type='text/html')
+    with patch_session(response):
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, True)
+    
+    assert paths == [local_file]
+    assert 'Cannot verify' in caplog.text
+
+
+def test_skip_existing_false_marks_file_stale(downloader, granule, local_file):
+    with patch_session(make_response()) as get_session:
+        paths, stale = downloader._granule_on_disk(granule, local_file.parent, False)
+    
+    assert paths is None
+    assert stale == [local_file]
+    get_session.return_value.get.assert_not_called()
+
+
+def test_missing_file_is_not_checked(downloader, granule, tmp_path):
+    with patch_session(make_response()) as get_session:
+        paths, stale = downloader._granule_on_disk(granule, tmp_path / 'new', True)
+    
+    assert paths is None
+    assert stale == []
+    get_session.return_value.get.assert_not_called()
+
+
+def test_stale_file_is_replaced_by_its_own_download(downloader, granule, local_file):
+    def download(granules, local_path):
+        assert not local_file.exists()
+        local_file.write_bytes(b'new data')
+        return [str(local_file)]
+    
+    with mock.patch('earthaccess.download', side_effect=download):
+        paths = downloader._download_one(granule, local_file.parent, [local_file])
+    
+    assert paths == [local_file]
+    assert local_file.read_bytes() == b'new data'
+
+
+def test_failed_download_keeps_existing_files(downloader, tmp_path):
+    granules = []
+    for name in ('a', 'b', 'c'):
+        granule = mock.Mock(name=name)
+        granule.data_links.return_value = [f'https://example.com/{name}.hdf']
+        granules.append(granule)
+    stale_file = tmp_path / 'c.hdf'
+    stale_file.write_bytes(CONTENT)
+    
+    release = threading.Event()
+    
+    def download(granule, local_path):
+        if granule is granules[0]:
+            raise IOError('connection reset')
+        # Keep the only worker busy so the third granule stays queued
+        release.wait(5)
+        return []
+    
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    with mock.patch('earthaccess.search_data', return_value=granules), \
+            mock.patch('earthaccess.download', side_effect=download), \
+            patch_session(make_response(size=len(CONTENT) + 1)):
+        with pytest.raises(RuntimeError, match='connection reset'):
+            downloader.download_product(
+                'MOD13A2', (-120, 35, -115, 40), '2024-01-01', '2024-01-31',
+                output_dir=str(tmp_path), cache=False, max_workers=1
+            )
+    timer.join()
+    
+    assert stale_file.read_bytes() == CONTENT
+
+
+def test_failed_download_cancels_queued_granules(downloader, tmp_path):
+    granules = []
+    for name in ('a', 'b', 'c'):
+        granule = mock.Mock(name=name)
+        granule.data_links.return_value = [f'https://example.com/{name}.hdf']
+        granules.append(granule)
+    
+    release = threading.Event()
+    started = []
+    
+    def download_one(granule, save_dir, stale):
+        started.append(granule)
+        if granule is granules[0]:
+            raise IOError('connection reset')
+        # Keep the only worker busy so the third granule stays queued
+        release.wait(5)
+        return []
+    
+    # The private pool waits for the running download before raising
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    with mock.patch('earthaccess.search_data', return_value=granules), \
+            mock.patch.object(downloader, '_download_one', side_effect=download_one):
+        with pytest.raises(RuntimeError, match='connection reset'):
+            downloader.download_product(
+                'MOD13A2', (-120, 35, -115, 40), '2024-01-01', '2024-01-31',
+                output_dir=str(tmp_path), cache=False, max_workers=1
+            )
+    timer.join()
+    
+    assert granules[2] not in started
+
+
+def test_files_are_returned_in_search_order(downloader, tmp_path):
+    granules = []
+    for name in ('a', 'b', 'c'):
+        granule = mock.Mock(name=name)
+        granule.data_links.return_value = [f'https://example.com/{name}.hdf']
+        granules.append(granule)
+    (tmp_path / 'b.hdf').write_bytes(CONTENT)
+    
+    last_done = threading.Event()
+    
+    def download(granule, local_path):
+        # The first granule finishes after the last one
+        if granule is granules[0]:
+            last_done.wait(5)
+        else:
+            last_done.set()
+        name = granule.data_links()[0].rsplit('/', 1)[-1]
+        return [str(tmp_path / name)]
+    
+    with mock.patch('earthaccess.search_data', return_value=granules), \
+            mock.patch('earthaccess.download', side_effect=download), \
+            patch_session(make_response()):
+        paths = downloader.download_product(
+            'MOD13A2', (-120, 35, -115, 40), '2024-01-01', '2024-01-31',
+            output_dir=str(tmp_path), cache=False, max_workers=2
+        )
+    
+    assert paths == [tmp_path / name for name in ('a.hdf', 'b.hdf', 'c.hdf')]
+
+
+def test_shared_pool_worker_cannot_reuse_shared_pool(downloader):
+    future = get_download_executor().submit(
+        downloader.download_product,
+        'MOD13A2', (-120, 35, -115, 40), '2024-01-01', '2024-01-31'
+    )
+    with pytest.raises(RuntimeError, match='max_workers'):
+        future.result(timeout=5)
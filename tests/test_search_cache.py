@@ -0,0 +1,80 @@
+"""
+Tests for caching granule search results on disk.
+"""
+
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from landsurface.downloaders.modis import MODISDownloader
+
+
+SEARCH = dict(
+    short_name='MOD13A2',
+    temporal=('2024-01-01', '2024-01-31'),
+    bounding_box=(-120, 35, -115, 40)
+)
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    return MODISDownloader(output_dir=str(tmp_path), verbose=False)
+
+
+def cache_files(downloader):
+    return list((downloader.output_dir / '.search_cache').glob('*.pkl'))
+
+
+def test_repeated_search_uses_cache(downloader):
+    with mock.patch('earthaccess.search_data', return_value=['g1', 'g2']) as search:
+        first = downloader._search_cached(**SEARCH)
+        second = downloader._search_cached(**SEARCH)
+    
+    assert first == second == ['g1', 'g2']
+    search.assert_called_once_with(**SEARCH)
+
+
+def test_different_search_is_not_cached(downloader):
+    with mock.patch('earthaccess.search_data', return_value=['g1']) as search:
+        downloader._search_cached(**SEARCH)
+        downloader._search_cached(**dict(SEARCH, short_name='MOD11A1'))
+    
+    assert search.call_count == 2
+
+
+def test_expired_cache_searches_again(downloader):
+    with mock.patch('earthaccess.search_data', return_value=['old']):
+        downloader._search_cached(**SEARCH)
+    
+    # Age the cached result past the TTL
+    (path,) = cache_files(downloader)
+    stale = time.time() - 2 * 86400
+    os.utime(path, (stale, stale))
+    
+    with mock.patch('earthaccess.search_data', return_value=['new']) as search:
+        results = downloader._search_cached(**SEARCH)
+    
+    assert results == ['new']
+    search.assert_called_once()
+
+
+def test_corrupt_cache_is_a_miss(downloader, caplog):
+    with mock.patch('earthaccess.search_data', return_value=['g1']):
+        downloader._search_cached(**SEARCH)
+    
+    (path,) = cache_files(downloader)
+    path.write_bytes(b'not a pickle')
+    
+    with mock.patch('earthaccess.search_data', return_value=['g2']) as search:
+        results = downloader._search_cached(**SEARCH)
+    
+    assert results == ['g2']
+    search.assert_called_once()
+    assert 'unreadable search cache' in caplog.text
+    
+    # The corrupt entry is replaced by the new results
+    with mock.patch('earthaccess.search_data') as search:
+        assert downloader._search_cached(**SEARCH) == ['g2']
+    search.assert_not_called()